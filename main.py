@@ -1,16 +1,12 @@
 import os
 import sys
 import traceback
-import copy
 
-from PySide2 import QtCore, QtGui, QtWidgets
-
-from shiboken2 import wrapInstance
+from PySide2 import QtCore
 
 import maya.cmds as cmds
 import maya.mel as mel
 import maya.OpenMaya as om
-import maya.OpenMayaUI as omui
 
 
 class BPlayblast(QtCore.QObject):
@@ -39,6 +35,16 @@ class BPlayblast(QtCore.QObject):
         "HD 540": (960, 540)
     }
 
+    FRAME_RATE_LOOKUP = {
+        "game": 15.0,
+        "film": 24.0,
+        "pal": 25.0,
+        "ntsc": 30.0,
+        "show": 48.0,
+        "palf": 50.0,
+        "ntscf": 60.0
+    }
+
     FRAME_RANGE_PRESETS = [
         "Render",
         "Playback",
@@ -67,6 +73,31 @@ class BPlayblast(QtCore.QObject):
         "ultrafast"
     ]
 
+    HW_ENCODER_PROBE_TIMEOUT_MS = 5000
+
+    H264_HW_ENCODERS = [
+        "h264_nvenc",
+        "h264_qsv"
+    ]
+
+    NVENC_PRESETS = {
+        "veryslow": "p7",
+        "slow": "p6",
+        "medium": "p5",
+        "fast": "p4",
+        "faster": "p3",
+        "ultrafast": "p1"
+    }
+
+    QSV_PRESETS = {
+        "veryslow": "veryslow",
+        "slow": "slow",
+        "medium": "medium",
+        "fast": "fast",
+        "faster": "faster",
+        "ultrafast": "veryfast"
+    }
+
     VIEWPORT_VISIBILITY_LOOKUP = [
         ["Controllers", "controllers"],
         ["NURBS Curves", "nurbsCurves"],
@@ -113,14 +144,36 @@ class BPlayblast(QtCore.QObject):
         "Dynamics": ["NURBS Surfaces", "Polygons", "Dynamics", "Fluids", "nParticles"]
     }
 
+    # stateString writes the long name of these flags
+    VIEWPORT_VISIBILITY_STATE_FLAGS = {
+        "cv": "controlVertices",
+        "hud": "headsUpDisplay",
+        "hos": "holdOuts",
+        "sel": "selectionHiliteDisplay"
+    }
+
+    VIEWPORT_VISIBILITY_NAMES = tuple(item[0] for item in VIEWPORT_VISIBILITY_LOOKUP)
+    VIEWPORT_VISIBILITY_FLAGS = tuple(item[1] for item in VIEWPORT_VISIBILITY_LOOKUP)
+    VIEWPORT_VISIBILITY_PRESET_SETS = {preset: frozenset(names) for preset, names in VIEWPORT_VISIBILITY_PRESETS.items()}
+
+    RESOLUTION_PRESETS_STR = ", ".join(f"'{preset}'" for preset in RESOLUTION_LOOKUP)
+    FRAME_RANGE_PRESETS_STR = ", ".join(f"'{preset}'" for preset in FRAME_RANGE_PRESETS)
+    CONTAINERS_STR = ", ".join(f"'{container}'" for container in VIDEO_ENCODER_LOOKUP)
+    VIDEO_ENCODERS_STR = {container: ", ".join(f"'{encoder}'" for encoder in encoders) for container, encoders in VIDEO_ENCODER_LOOKUP.items()}
+    H264_QUALITIES_STR = ", ".join(f"'{quality}'" for quality in H264_QUALITIES)
+    H264_PRESETS_STR = ", ".join(f"'{preset}'" for preset in H264_PRESETS)
+
     output_logged = QtCore.Signal(str)
 
     def __init__(self, ffmpeg_path=None, log_to_maya=True):
 
         super(BPlayblast, self).__init__()
 
+        self.create_preset_resolvers()
+
         self.set_ffmpeg_path(ffmpeg_path)
         self.set_maya_logging_enabled(log_to_maya)
+        self.set_hw_encoding_enabled(True)
 
         self.set_camera(BPlayblast.DEFAULT_CAMERA)
         self.set_resolution(BPlayblast.DEFAULT_RESOLUTION)
@@ -132,7 +185,47 @@ class BPlayblast(QtCore.QObject):
 
         self.set_visibility(BPlayblast.DEFAULT_VISIBILITY)
 
-        self.initialize_ffmpeg_process()
+        self._ffmpeg_pipe = None
+
+        self._scene_name = None
+        self._project_dir_path = None
+
+        # Scene and project paths are only cached between create_callbacks() and close()
+        self._callback_ids = []
+
+    def create_preset_resolvers(self):
+        self._resolution_resolvers = {
+            "Render": self.get_render_resolution
+        }
+
+        self._frame_range_resolvers = {
+            "Render": self.get_render_frame_range,
+            "Playback": lambda: (int(cmds.playbackOptions(q=True, minTime=True)), int(cmds.playbackOptions(q=True, maxTime=True))),
+            "Animation": lambda: (int(cmds.playbackOptions(q=True, animationStartTime=True)), int(cmds.playbackOptions(q=True, animationEndTime=True)))
+        }
+
+    def create_callbacks(self):
+        self.delete_callbacks()
+
+        self._callback_ids.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self.clear_cached_paths))
+        self._callback_ids.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self.clear_cached_paths))
+        self._callback_ids.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterSave, self.clear_cached_paths))
+        self._callback_ids.append(om.MEventMessage.addEventCallback("workspaceChanged", self.clear_cached_paths))
+
+    def delete_callbacks(self):
+        for callback_id in self._callback_ids:
+            om.MMessage.removeCallback(callback_id)
+
+        self._callback_ids = []
+        self.clear_cached_paths()
+
+    def close(self):
+        # Maya keeps the callbacks alive after this instance is gone, callers of create_callbacks() must close() it
+        self.delete_callbacks()
+
+    def clear_cached_paths(self, *args):
+        self._scene_name = None
+        self._project_dir_path = None
 
     def set_maya_logging_enabled(self, enabled):
         self._log_to_maya = enabled
@@ -161,9 +254,79 @@ class BPlayblast(QtCore.QObject):
         else:
             self._ffmpeg_path = BPlayblast.DEFAULT_FFMPEG_PATH
 
+        # Hardware encoder support depends on the ffmpeg build, probe again on next use
+        self._hw_encoder = None
+        self._hw_encoder_probed = False
+
     def get_ffmpeg_path(self):
         return self._ffmpeg_path
 
+    def set_hw_encoding_enabled(self, enabled):
+        self._hw_encoding_enabled = enabled
+
+    def get_hw_encoder(self):
+        if not self._hw_encoding_enabled:
+            return None
+
+        if not self._hw_encoder_probed:
+            self._hw_encoder = self.probe_hw_encoder()
+            self._hw_encoder_probed = True
+
+            if self._hw_encoder:
+                self.log_output(f"Using hardware encoder: {self._hw_encoder}")
+
+        return self._hw_encoder
+
+    def probe_hw_encoder(self):
+        probe_process = QtCore.QProcess()
+        if not self.run_probe_process(probe_process, ["-hide_banner", "-encoders"]):
+            return None
+
+        available_encoders = str(probe_process.readAllStandardOutput(), "utf-8").split()
+
+        crf = BPlayblast.H264_QUALITIES[self._h264_quality]
+
+        for encoder in BPlayblast.H264_HW_ENCODERS:
+            if encoder not in available_encoders:
+                continue
+
+            # A listed encoder can still be missing its device, driver or support for the options, confirm it with a one frame encode
+            probe_args = ["-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=size=256x256", "-frames:v", "1"]
+            probe_args += self.create_h264_codec_args(encoder, crf, self._h264_preset)
+            probe_args += ["-f", "null", "-"]
+
+            if self.run_probe_process(probe_process, probe_args):
+                return encoder
+
+        return None
+
+    def run_probe_process(self, probe_process, probe_args):
+        # Probing runs on the UI thread, don't let a hanging driver freeze Maya
+        probe_process.start(self._ffmpeg_path, probe_args)
+        if not probe_process.waitForFinished(BPlayblast.HW_ENCODER_PROBE_TIMEOUT_MS):
+            probe_process.kill()
+            probe_process.waitForFinished()
+            return False
+
+        return probe_process.exitStatus() == QtCore.QProcess.NormalExit and probe_process.exitCode() == 0
+
+    def create_h264_codec_args(self, encoder, crf, preset):
+        # Profile and level stay fixed for compatibility with common players
+        if encoder == "h264_nvenc":
+            codec_args = ["-c:v", "h264_nvenc", "-rc", "vbr", "-cq", str(crf), "-b:v", "0", "-preset", BPlayblast.NVENC_PRESETS[preset]]
+            codec_args += ["-profile", "high", "-level", "4.0", "-pix_fmt", "yuv420p"]
+        elif encoder == "h264_qsv":
+            codec_args = ["-c:v", "h264_qsv", "-global_quality", str(crf), "-preset", BPlayblast.QSV_PRESETS[preset]]
+            codec_args += ["-profile", "high", "-pix_fmt", "nv12"]
+        else:
+            codec_args = ["-c:v", "libx264", "-crf:v", str(crf), "-preset:v", preset, "-profile", "high", "-level", "4.0", "-pix_fmt", "yuv420p"]
+
+            # Preview playblasts don't benefit from B-frames or rate control lookahead
+            if preset == "ultrafast":
+                codec_args += ["-tune", "zerolatency"]
+
+        return codec_args
+
     def validate_ffmpeg(self):
         if not self._ffmpeg_path:
             self.log_error("ffmpeg executable path not set")
@@ -177,28 +340,44 @@ class BPlayblast(QtCore.QObject):
 
         return True
     
-    def initialize_ffmpeg_process(self):
-        self._ffmpeg_process = QtCore.QProcess()
-        self._ffmpeg_process.readyReadStandardError.connect(self.process_ffmpeg_output)
-    
-    def execute_ffmpeg_cmd(self, command):
-        self._ffmpeg_process.start(command)
-        if self._ffmpeg_process.waitForStarted():
-            while self._ffmpeg_process.state() != QtCore.QProcess.NotRunning:
-                QtCore.QCoreApplication.processEvents()
-                QtCore.QThread.usleep(10)
+    def start_ffmpeg_pipe(self, ffmpeg_args, frame_path_prefix, padding):
+        ffmpeg_pipe = BPlayblastFramePipe(self._ffmpeg_path, ffmpeg_args, frame_path_prefix, padding)
+        ffmpeg_pipe.output_logged.connect(self.log_output)
+        ffmpeg_pipe.start()
 
-    def process_ffmpeg_output(self):
-        byte_array_output = self._ffmpeg_process.readAllStandardError()
+        self._ffmpeg_pipe = ffmpeg_pipe
 
-        if sys.version_info.major < 3:
-            output = str(byte_array_output)
-        else:
-            output = str(byte_array_output, "utf-8")
-        
-        self.log_output(output)
-    
-    def encode_h264(self, source_path, output_path, start_frame):
+        return ffmpeg_pipe
+
+    def finish_ffmpeg_pipe(self, ffmpeg_pipe, playblast_failed):
+        ffmpeg_pipe.set_playblast_finished(playblast_failed)
+
+        # Block on a local event loop so the pipe output keeps being logged without polling
+        loop = QtCore.QEventLoop()
+        ffmpeg_pipe.finished.connect(loop.quit)
+        if ffmpeg_pipe.isRunning():
+            loop.exec_()
+
+        ffmpeg_pipe.wait()
+        self._ffmpeg_pipe = None
+
+        return ffmpeg_pipe.is_successful()
+
+    def finalize_output(self, temp_output_path, output_path, encode_succeeded):
+        if encode_succeeded:
+            try:
+                os.replace(temp_output_path, output_path)
+                return True
+            except OSError as error:
+                self.log_error(f"Failed to write output file: {output_path} ({error})")
+
+        # A partial file is never left behind, the previous output stays untouched
+        if os.path.exists(temp_output_path):
+            os.remove(temp_output_path)
+
+        return False
+
+    def create_h264_args(self, output_path, start_frame):
         frame_rate = self.get_frame_rate()
 
         audio_file_path, audio_frame_offset = self.get_audio_attributes()
@@ -208,45 +387,44 @@ class BPlayblast(QtCore.QObject):
         crf = BPlayblast.H264_QUALITIES[self._h264_quality]
         preset = self._h264_preset
 
-        ffmpeg_cmd = self._ffmpeg_path
-        ffmpeg_cmd += f' -y -framerate {frame_rate} -i "{source_path}"'
+        # Leave a core free for Maya while ffmpeg is running
+        filter_threads = max(1, (os.cpu_count() or 1) - 1)
+
+        ffmpeg_args = ["-y", "-filter_threads", str(filter_threads)]
+
+        # Only errors are forwarded to the log, progress output would be logged for every update
+        ffmpeg_args += ["-hide_banner", "-nostats", "-loglevel", "error"]
+
+        # The input format and codec are known, skip stream probing so encoding starts on the first frame
+        ffmpeg_args += ["-f", "image2pipe", "-probesize", "32", "-analyzeduration", "0"]
+        ffmpeg_args += ["-framerate", str(frame_rate), "-c:v", "bmp", "-i", "pipe:0"]
 
         if audio_file_path:
-            ffmpeg_cmd += f' -ss {audio_offset} -i "{audio_file_path}"'
-        
-        ffmpeg_cmd += f' -c:v libx264 -crf:v {crf} -preset:v {preset} -profile high -level 4.0 -pix_fmt yuv420p'
+            ffmpeg_args += ["-ss", str(audio_offset), "-i", audio_file_path]
+
+        ffmpeg_args += ["-threads", "0", "-thread_type", "slice+frame"]
+
+        ffmpeg_args += self.create_h264_codec_args(self.get_hw_encoder(), crf, preset)
 
         if audio_file_path:
-            ffmpeg += f' -filter_complex "[1:0] apad" -shortest'
+            ffmpeg_args += ["-filter_complex", "[1:0] apad", "-shortest"]
 
-        ffmpeg_cmd += f' "{output_path}"'
+        ffmpeg_args.append(output_path)
 
-        self.log_output(ffmpeg_cmd)
+        self.log_output(" ".join([self._ffmpeg_path] + ffmpeg_args))
 
-        self.execute_ffmpeg_cmd(ffmpeg_cmd)
+        return ffmpeg_args
 
     def get_frame_rate(self):
         rate_str = cmds.currentUnit(q=True, time=True)
 
-        if rate_str == "game":
-            frame_rate = 15.0
-        elif rate_str == "film":
-            frame_rate = 24.0
-        elif rate_str == "pal":
-            frame_rate = 25.0
-        elif rate_str == "ntsc":
-            frame_rate = 30.0
-        elif rate_str == "show":
-            frame_rate = 48.0
-        elif rate_str == "palf":
-            frame_rate = 50.0
-        elif rate_str == "ntscf":
-            frame_rate = 60.0
-        elif rate_str.endswith("fps"):
-            frame_rate = float(rate_str[0:-3])
-        else:
-            raise RuntimeError("Unsupported frame rate: {0}".format(rate_str))
-        
+        frame_rate = BPlayblast.FRAME_RATE_LOOKUP.get(rate_str)
+        if frame_rate is None:
+            if rate_str.endswith("fps"):
+                frame_rate = float(rate_str[0:-3])
+            else:
+                raise RuntimeError("Unsupported frame rate: {0}".format(rate_str))
+
         return frame_rate
     
     def get_audio_attributes(self):
@@ -257,22 +435,14 @@ class BPlayblast(QtCore.QObject):
             if file_info.exists():
                 offset = cmds.getAttr(f"{sound_node}.offset")
                 return (file_path, offset)
-            
-        else:
-            return (None, None)
+
+        return (None, None)
 
     def get_audio_offset_in_sec(self, start_frame, audio_frame_offset, frame_rate):
         return (start_frame - audio_frame_offset) / frame_rate
 
     def remove_temp_dir(self, temp_dir_path):
-        playblast_dir = QtCore.QDir(temp_dir_path)
-        playblast_dir.setNameFilters(["*.png"])
-        playblast_dir.setFilter(QtCore.QDir.Files)
-
-        for file in playblast_dir.entryList():
-            playblast_dir.remove(file)
-
-        if not playblast_dir.rmdir(temp_dir_path):
+        if not QtCore.QDir(temp_dir_path).removeRecursively():
             self.log_warning(f"Failed to remove temporary directory: {temp_dir_path}")
 
     def open_in_viewer(self, path):
@@ -286,6 +456,9 @@ class BPlayblast(QtCore.QObject):
                 QtCore.QProcess.startDetached(executable_path, [path])
                 return
             
+        # QtGui is only needed here, headless sessions never import it
+        from PySide2 import QtGui
+
         QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(path))
 
     def set_resolution(self, resolution):
@@ -309,8 +482,7 @@ class BPlayblast(QtCore.QObject):
                 self.log_error(f"Invalid resolution: {width_height}. Values must be greater than zero.")
                 return
         else:
-            presets = [f"'{preset}'" for preset in BPlayblast.RESOLUTION_LOOKUP.keys()]
-            self.log_error(f"Invalid resolution: {width_height}. Expected one of [int, int], {', '.join(presets)}")
+            self.log_error(f"Invalid resolution: {width_height}. Expected one of [int, int], {BPlayblast.RESOLUTION_PRESETS_STR}")
             return
         
         self._width_height = (width_height[0], width_height[1])
@@ -321,30 +493,41 @@ class BPlayblast(QtCore.QObject):
         
         return self._width_height
 
+    def get_node_plugs(self, node_name, attr_names):
+        selection_list = om.MSelectionList()
+        selection_list.add(node_name)
+
+        node = om.MObject()
+        selection_list.getDependNode(0, node)
+
+        node_fn = om.MFnDependencyNode(node)
+        return [node_fn.findPlug(attr_name, False) for attr_name in attr_names]
+
+    def get_render_resolution(self):
+        width_plug, height_plug = self.get_node_plugs("defaultResolution", ["width", "height"])
+        return (width_plug.asInt(), height_plug.asInt())
+
+    def get_render_frame_range(self):
+        start_frame_plug, end_frame_plug = self.get_node_plugs("defaultRenderGlobals", ["startFrame", "endFrame"])
+
+        ui_unit = om.MTime.uiUnit()
+        return (start_frame_plug.asMTime().asUnits(ui_unit), end_frame_plug.asMTime().asUnits(ui_unit))
+
     def preset_to_resolution(self, resolution_preset):
-        if resolution_preset == "Render":
-            width = cmds.getAttr("defaultResolution.width")
-            height = cmds.getAttr("defaultResolution.height")
-            return (width, height)
-        elif resolution_preset in BPlayblast.RESOLUTION_LOOKUP.keys():
+        resolver = self._resolution_resolvers.get(resolution_preset)
+        if resolver:
+            return resolver()
+        elif resolution_preset in BPlayblast.RESOLUTION_LOOKUP:
             return BPlayblast.RESOLUTION_LOOKUP[resolution_preset]
         else:
             raise RuntimeError(f"Invalid resolution preset: {resolution_preset}")
         
     def preset_to_frame_range(self, frame_range_preset):
-        if frame_range_preset == "Render":
-            start_frame = cmds.getAttr("defaultRenderGlobals.startFrame")
-            end_frame = cmds.getAttr("defaultRenderGlobals.endFrame")
-        elif frame_range_preset == "Playback":
-            start_frame = int(cmds.playbackOptions(q=True, minTime=True))
-            end_frame = int(cmds.playbackOptions(q=True, maxTime=True))            
-        elif frame_range_preset == "Animation":
-            start_frame = int(cmds.playbackOptions(q=True, animationStartTime=True))
-            end_frame = int(cmds.playbackOptions(q=True, animationEndTime=True))
-        else:
+        resolver = self._frame_range_resolvers.get(frame_range_preset)
+        if not resolver:
             raise RuntimeError(f"Invalid frame range preset: {frame_range_preset}")
-        
-        return (start_frame, end_frame)
+
+        return resolver()
     
     def set_visibility(self, visibility_data):
         if not visibility_data:
@@ -356,7 +539,7 @@ class BPlayblast(QtCore.QObject):
             if visibility_data is None:
                 return
             
-        self._visibility = copy.copy(visibility_data)
+        self._visibility = tuple(visibility_data)
             
 
     def get_visibility(self):
@@ -366,37 +549,35 @@ class BPlayblast(QtCore.QObject):
         return self._visibility
 
     def preset_to_visibility(self, visibility_preset):
-        if not visibility_preset in BPlayblast.VIEWPORT_VISIBILITY_PRESETS.keys():
+        if not visibility_preset in BPlayblast.VIEWPORT_VISIBILITY_PRESET_SETS:
             self.log_error(f"Invalid visibility preset: {visibility_preset}")
             return None
 
-        preset_names = BPlayblast.VIEWPORT_VISIBILITY_PRESETS[visibility_preset]
-
-        visibility_data = []
-
-        if preset_names:
-            for lookup_item in BPlayblast.VIEWPORT_VISIBILITY_LOOKUP:
-                visibility_data.append(lookup_item[0] in preset_names)
+        preset_names = BPlayblast.VIEWPORT_VISIBILITY_PRESET_SETS[visibility_preset]
+        if not preset_names:
+            return []
 
-        return visibility_data
+        return [name in preset_names for name in BPlayblast.VIEWPORT_VISIBILITY_NAMES]
     
     def set_encoding(self, container_format, encoder):
-        if container_format not in (containers := BPlayblast.VIDEO_ENCODER_LOOKUP.keys()):
-            self.log_error(f"Invalid container: {container_format}. Expected one of {containers}")
+        if container_format not in BPlayblast.VIDEO_ENCODER_LOOKUP:
+            self.log_error(f"Invalid container: {container_format}. Expected one of {BPlayblast.CONTAINERS_STR}")
+            return
         
-        if encoder not in (encoders := BPlayblast.VIDEO_ENCODER_LOOKUP[container_format]):
-            self.log_error(f"Invalid encoder: {encoder}. Expected one of {encoders}")
+        if encoder not in BPlayblast.VIDEO_ENCODER_LOOKUP[container_format]:
+            self.log_error(f"Invalid encoder: {encoder}. Expected one of {BPlayblast.VIDEO_ENCODERS_STR[container_format]}")
+            return
 
         self._container_format = container_format
         self._encoder = encoder
 
     def set_h264_settings(self, quality, preset):
-        if not quality in (h264_qualities := BPlayblast.H264_QUALITIES.keys()):
-            self.log_error(f"Invalid h264 quality: {quality}. Expected of {h264_qualities}")
+        if not quality in BPlayblast.H264_QUALITIES:
+            self.log_error(f"Invalid h264 quality: {quality}. Expected one of {BPlayblast.H264_QUALITIES_STR}")
             return
         
-        if preset not in (h264_presets := BPlayblast.H264_PRESETS):
-            self.log_error(f"Invalid h264 preset: {preset}. Expected of {h264_presets}")
+        if preset not in BPlayblast.H264_PRESETS:
+            self.log_error(f"Invalid h264 preset: {preset}. Expected one of {BPlayblast.H264_PRESETS_STR}")
             return
         
         self._h264_quality = quality
@@ -437,8 +618,20 @@ class BPlayblast(QtCore.QObject):
         
         return (self._start_frame, self._end_frame)
 
+    def camera_exists(self, camera):
+        if not camera:
+            return False
+
+        # ls doesn't raise on names matching several nodes, those are not valid cameras either
+        nodes = cmds.ls(camera, long=True)
+        if not nodes or len(nodes) != 1:
+            return False
+
+        # Cameras are usually referenced by their transform rather than the camera shape
+        return cmds.objectType(nodes[0]) == "camera" or bool(cmds.listRelatives(nodes[0], shapes=True, type="camera"))
+
     def set_camera(self,  camera):  
-        if camera and camera not in cmds.listCameras():
+        if camera and not self.camera_exists(camera):
             self.log_error(f"Camera does not exist: {camera}")
             camera = None
 
@@ -468,16 +661,23 @@ class BPlayblast(QtCore.QObject):
             self.log_error("Failed to get active view")
 
     def get_scene_name(self):
-        scene_name = cmds.file(q=True, sceneName=True, shortName=True)
-        if scene_name:
-            scene_name = os.path.splitext(scene_name)[0]
-        else:
-            scene_name = "untitled"
+        # Cached values are only trusted while the callbacks clearing them are registered
+        if self._scene_name is None or not self._callback_ids:
+            scene_name = cmds.file(q=True, sceneName=True, shortName=True)
+            if scene_name:
+                scene_name = os.path.splitext(scene_name)[0]
+            else:
+                scene_name = "untitled"
 
-        return scene_name
+            self._scene_name = scene_name
+
+        return self._scene_name
 
     def get_project_dir_path(self):
-        return cmds.workspace(q=True, rootDirectory=True)
+        if self._project_dir_path is None or not self._callback_ids:
+            self._project_dir_path = cmds.workspace(q=True, rootDirectory=True)
+
+        return self._project_dir_path
     
     def get_viewport_visibility(self):
         model_panel = self.get_viewport_panel()
@@ -487,9 +687,20 @@ class BPlayblast(QtCore.QObject):
         
         viewport_visibility = []
         try:
-            for item in BPlayblast.VIEWPORT_VISIBILITY_LOOKUP:
-                kwargs = {item[1]: True}
-                viewport_visibility.append(cmds.modelEditor(model_panel, q=True, **kwargs))
+            # A single state query returns every flag as "-flag value" pairs of a modelEditor edit command
+            state_tokens = cmds.modelEditor(model_panel, q=True, stateString=True).split()
+            state_values = {}
+            for index in range(len(state_tokens) - 1):
+                if state_tokens[index].startswith("-"):
+                    state_values[state_tokens[index][1:]] = state_tokens[index + 1]
+
+            for flag in BPlayblast.VIEWPORT_VISIBILITY_FLAGS:
+                state_flag = BPlayblast.VIEWPORT_VISIBILITY_STATE_FLAGS.get(flag, flag)
+                if state_flag in state_values:
+                    viewport_visibility.append(state_values[state_flag] in ("1", "true"))
+                else:
+                    kwargs = {flag: True}
+                    viewport_visibility.append(cmds.modelEditor(model_panel, q=True, **kwargs))
         except:
             traceback.print_exc()
             self.log_error("Failed to get active viewport visibility. See script editor.")
@@ -498,17 +709,11 @@ class BPlayblast(QtCore.QObject):
         return viewport_visibility
 
     def set_viewport_visibility(self, model_editor, visibility_flags):
-        cmds.modelEditor(model_editor, e=True, **visibility_flags)
+        if visibility_flags:
+            cmds.modelEditor(model_editor, e=True, **visibility_flags)
 
     def create_viewport_visibility_flags(self, visibility_data):
-        visibility_flags = {}
-
-        data_index = 0
-        for item in BPlayblast.VIEWPORT_VISIBILITY_LOOKUP:
-            visibility_flags[item[1]] = visibility_data[data_index]
-            data_index += 1
-
-        return visibility_flags
+        return dict(zip(BPlayblast.VIEWPORT_VISIBILITY_FLAGS, visibility_data))
 
     def resolve_output_directory_path(self, dir_path):
         if "{project}" in dir_path:
@@ -533,8 +738,7 @@ class BPlayblast(QtCore.QObject):
             return [start_frame, end_frame]
 
         except:
-            presets = [f"'{preset}'" for preset in BPlayblast.FRAME_RANGE_PRESETS]
-            self.log_error(f"Invalid frame range. Expected one of (start_frame, end_frame) or {', '.join(presets)}")
+            self.log_error(f"Invalid frame range. Expected one of (start_frame, end_frame) or {BPlayblast.FRAME_RANGE_PRESETS_STR}")
 
             return None
         
@@ -542,6 +746,11 @@ class BPlayblast(QtCore.QObject):
         return self._container_format != "Image"
 
     def execute(self, output_dir, filename, padding=4, show_ornaments=True, show_in_viewer=True, overwrite=False):
+        # Waiting on the encode runs an event loop, which lets the UI request another playblast
+        if self._ffmpeg_pipe:
+            self.log_error("A playblast is still being encoded. Wait for it to finish and retry")
+            return
+
         if self.requires_ffmpeg() and not self.validate_ffmpeg():
             self.log_error("ffmpeg executable is not configured. See script editor for details.")
             return
@@ -565,15 +774,28 @@ class BPlayblast(QtCore.QObject):
             padding = BPlayblast.DEFAULT_PADDING
 
         if self.requires_ffmpeg():
+            if self._encoder != "h264":
+                self.log_error(f"Encoding failed. Unsupported encoder ({self._encoder}) for container ({self._container_format})")
+                return
+
             output_path = os.path.normpath(os.path.join(output_dir, f"{filename}.{self._container_format}"))
             if not overwrite and os.path.exists(output_path):
                 self.log_error(f"Output file already exists. Enable overwrite to ignore.")
                 return
 
-            playblast_output_dir = f"{output_dir}/playblast_temp"
+            # ffmpeg doesn't create missing directories and the frames are no longer written there
+            if not QtCore.QDir().mkpath(output_dir):
+                self.log_error(f"Failed to create output directory: {output_dir}")
+                return
+
+            # ffmpeg writes to a temporary file that only replaces the output once encoding succeeded
+            temp_output_path = os.path.normpath(os.path.join(output_dir, f"{filename}.bplayblast_temp.{self._container_format}"))
+
+            # Keep the intermediate frames on local storage, the output directory may be a network share
+            playblast_output_dir = f"{QtCore.QDir.tempPath()}/bplayblast_temp_{os.getpid()}"
             playblast_output = os.path.normpath(os.path.join(playblast_output_dir, filename))
             force_overwrite = True
-            compression = "png"
+            compression = "bmp"
             image_quality = 100
             index_from_zero = True
             viewer = False
@@ -608,6 +830,10 @@ class BPlayblast(QtCore.QObject):
 
         self.log_output(f"Playblast options: {options}")
 
+        if self.requires_ffmpeg():
+            # Everything that can fail or probe the hardware encoder runs before the viewport is changed
+            ffmpeg_args = self.create_h264_args(temp_output_path, start_frame)
+
         # Store original viewport settings
         orig_camera = self.get_active_camera()
 
@@ -615,461 +841,163 @@ class BPlayblast(QtCore.QObject):
         if not camera:
             camera = orig_camera
 
-        if not camera in cmds.listCameras():
+        if not self.camera_exists(camera):
             self.log_error(f"Camera does not exists: {camera}")
             return
         
-        self.set_active_camera(camera)
-
         orig_visibility_flags = self.create_viewport_visibility_flags(self.get_viewport_visibility())
         playblast_visibility_flags = self.create_viewport_visibility_flags(self.get_visibility())
 
-        model_editor = cmds.modelPanel(viewport_model_panel, q=True, modelEditor=True)
-        self.set_viewport_visibility(model_editor, playblast_visibility_flags)
+        # Only the flags that differ from the viewport need to be edited and restored
+        changed_visibility_flags = {flag: value for flag, value in playblast_visibility_flags.items() if orig_visibility_flags.get(flag) != value}
+        restore_visibility_flags = {flag: orig_visibility_flags[flag] for flag in changed_visibility_flags}
 
-        playblast_failed = False
-        try:
-            cmds.playblast(**options)
-        except:
-            traceback.print_exc()
-            self.log_error("Failed to created playblast. See script editor for details")
-            playblast_failed = True
-        finally:
-            # Restore original viewport settings
-            self.set_active_camera(orig_camera)
-            self.set_viewport_visibility(model_editor, orig_visibility_flags)
+        model_editor = cmds.modelPanel(viewport_model_panel, q=True, modelEditor=True)
 
-        if playblast_failed:
-            return
-        
+        ffmpeg_pipe = None
         if self.requires_ffmpeg():
-            source_path = f"{playblast_output_dir}/{filename}.%0{padding}d.png"
-
-            if self._encoder == "h264":
-                self.encode_h264(source_path, output_path, start_frame)
-            else:
-                self.log_error(f"Encoding failed. Unsupported encoder ({self._encoder}) for container ({self._container_format})")
+            # Stale frames would be picked up by the pipe as soon as it starts
+            if os.path.exists(playblast_output_dir):
                 self.remove_temp_dir(playblast_output_dir)
-                return
-            
-            self.remove_temp_dir(playblast_output_dir)
-
-            if show_in_viewer:
-                self.open_in_viewer(output_path)
-
-class BPlayblastSettingsDialog(QtWidgets.QDialog):
-
-    def __init__(self, parent):
-        super(BPlayblastSettingsDialog, self).__init__(parent)
-
-        self.setWindowTitle("Settings")
-        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
-        self.setMinimumWidth(360)
-        self.setModal(True)
-
-        self.ffmpeg_path_le = QtWidgets.QLineEdit()
-        self.ffmpeg_path_select_btn = QtWidgets.QPushButton("...")
-        self.ffmpeg_path_select_btn.setFixedSize(24, 19)
-        self.ffmpeg_path_select_btn.clicked.connect(self.select_ffmpeg_executable)
-
-        ffmpeg_layout = QtWidgets.QHBoxLayout()
-        ffmpeg_layout.setSpacing(4)
-        ffmpeg_layout.addWidget(self.ffmpeg_path_le)
-        ffmpeg_layout.addWidget(self.ffmpeg_path_select_btn)
-
-        ffmpeg_grp = QtWidgets.QGroupBox("FFmpeg Path")
-        ffmpeg_grp.setLayout(ffmpeg_layout)
-
-        self.accept_btn = QtWidgets.QPushButton("Accept")
-        self.accept_btn.clicked.connect(self.accept)
-
-        self.cancel_btn = QtWidgets.QPushButton("Cancel")
-        self.cancel_btn.clicked.connect(self.close)
-
-        button_layout = QtWidgets.QHBoxLayout()
-        button_layout.addStretch()
-        button_layout.addWidget(self.accept_btn)
-        button_layout.addWidget(self.cancel_btn)
-
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setContentsMargins(4, 4, 4, 4)
-        main_layout.setSpacing(4)
-        main_layout.addWidget(ffmpeg_grp)
-        main_layout.addStretch()
-        main_layout.addLayout(button_layout)
-
-    def set_ffmpeg_path(self, path):
-        self.ffmpeg_path_le.setText(path)
-
-    def get_ffmpeg_path(self):
-        return self.ffmpeg_path_le.text()
-
-    def select_ffmpeg_executable(self):
-        current_path = self.ffmpeg_path_le.text()
 
-        new_path = QtWidgets.QFileDialog.getOpenFileName(self, "Select FFmpeg Executable", current_path)[0]
-        if new_path:
-            self.ffmpeg_path_le.setText(new_path)
+            # Start encoding before the playblast so frames are streamed to ffmpeg as they are written
+            ffmpeg_pipe = self.start_ffmpeg_pipe(ffmpeg_args, playblast_output, padding)
 
-class BPlayblastUi(QtWidgets.QDialog):
-
-    TITLE = "BPlayblast"
-
-
-    def __init__(self):
-        if sys.version_info.major < 3:
-            maya_main_window = wrapInstance(long(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
-        else:
-            maya_main_window = wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
-
-        super(BPlayblastUi, self).__init__(maya_main_window)
-
-        self.setWindowTitle(BPlayblastUi.TITLE)
-        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
-        self.setMinimumWidth(500)
-
-        self._playblast = BPlayblast()
-
-        self.load_settings()
-
-        self._settings_dialog = None
-
-        self.create_actions()
-        self.create_menus()
-        self.create_widgets()
-        self.create_layout()
-        self.create_connections()
-
-        self.append_output(f"BPlayblast v{BPlayblast.VERSION}")
-
-    def create_actions(self):
-        self.save_defaults_action = QtWidgets.QAction("Save Defaults", self)
-        self.save_defaults_action.triggered.connect(self.save_defaults)
-
-        self.load_defaults_action = QtWidgets.QAction("Load Defaults", self)
-        self.load_defaults_action.triggered.connect(self.load_defaults)
-
-        self.show_settings_action = QtWidgets.QAction("Settings...", self)
-        self.show_settings_action.triggered.connect(self.show_settings_dialog)
-
-        self.show_about_action = QtWidgets.QAction("About", self)
-        self.show_about_action.triggered.connect(self.show_about_dialog)
-
-    def create_menus(self):
-        self.main_menu = QtWidgets.QMenuBar()
-
-        edit_menu = self.main_menu.addMenu("Edit")
-        edit_menu.addAction(self.save_defaults_action)
-        edit_menu.addAction(self.load_defaults_action)
-        edit_menu.addSeparator()
-        edit_menu.addAction(self.show_settings_action)
-
-        help_menu = self.main_menu.addMenu("Help")
-        help_menu.addAction(self.show_about_action)
-
-    def create_widgets(self):
-        self.output_dir_path_le = QtWidgets.QLineEdit()
-        self.output_dir_path_le.setPlaceholderText("{project}/movies")
-
-        self.output_dir_path_select_btn = QtWidgets.QPushButton("...")
-        self.output_dir_path_select_btn.setFixedSize(24, 19)
-        self.output_dir_path_select_btn.setToolTip("Select Output Directory")
-
-        self.output_dir_path_show_folder_btn = QtWidgets.QPushButton(QtGui.QIcon(":fileOpen.png"), "")
-        self.output_dir_path_show_folder_btn.setFixedSize(24, 19)
-        self.output_dir_path_show_folder_btn.setToolTip("Show in Folder")
-
-        self.output_filename_le = QtWidgets.QLineEdit()
-        self.output_filename_le.setPlaceholderText("{scene}")
-        self.output_filename_le.setMaximumWidth(200)
-        self.force_overwrite_cb = QtWidgets.QCheckBox("Force overwrite")
-
-        self.resolution_select_cmb = QtWidgets.QComboBox()
-
-        self.resolution_width_sb = QtWidgets.QSpinBox()
-        self.resolution_width_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
-        self.resolution_width_sb.setRange(1, 9999)
-        self.resolution_width_sb.setMinimumWidth(40)
-        self.resolution_width_sb.setAlignment(QtCore.Qt.AlignRight)
-        self.resolution_height_sb = QtWidgets.QSpinBox()
-        self.resolution_height_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
-        self.resolution_height_sb.setRange(1, 9999)
-        self.resolution_height_sb.setMinimumWidth(40)
-        self.resolution_height_sb.setAlignment(QtCore.Qt.AlignRight)
-
-        self.camera_select_cmb = QtWidgets.QComboBox()
-        self.camera_select_hide_defaults_cb = QtWidgets.QCheckBox("Hide defaults")
-
-        self.frame_range_cmb = QtWidgets.QComboBox()
-
-        self.frame_range_start_sb = QtWidgets.QSpinBox()
-        self.frame_range_start_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
-        self.frame_range_start_sb.setRange(-9999, 9999)
-        self.frame_range_start_sb.setMinimumWidth(40)
-        self.frame_range_start_sb.setAlignment(QtCore.Qt.AlignRight)
-
-        self.frame_range_end_sb = QtWidgets.QSpinBox()
-        self.frame_range_end_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
-        self.frame_range_end_sb.setRange(-9999, 9999)
-        self.frame_range_end_sb.setMinimumWidth(40)
-        self.frame_range_end_sb.setAlignment(QtCore.Qt.AlignRight)
-
-        self.encoding_container_cmb = QtWidgets.QComboBox()
-
-        self.encoding_video_codec_cmb = QtWidgets.QComboBox()
-        self.encoding_video_codec_settings_btn = QtWidgets.QPushButton("Settings...")
-        self.encoding_video_codec_settings_btn.setFixedHeight(19)
-
-        self.visibility_cmb = QtWidgets.QComboBox()
-
-        self.visibility_customize_btn = QtWidgets.QPushButton("Customize...")
-        self.visibility_customize_btn.setFixedHeight(19)
-
-        self.ornaments_cb = QtWidgets.QCheckBox()
-        self.ornaments_cb.setChecked(True)
-
-        self.viewer_cb = QtWidgets.QCheckBox()
-        self.viewer_cb.setChecked(True)
-
-        self.output_edit = QtWidgets.QPlainTextEdit()
-        self.output_edit.setReadOnly(True)
-        self.output_edit.setWordWrapMode(QtGui.QTextOption.NoWrap)
-
-        self.refresh_btn = QtWidgets.QPushButton("Refresh")
-        self.clear_btn = QtWidgets.QPushButton("Clear")
-        self.playblast_btn = QtWidgets.QPushButton("Playblast")
-        self.close_btn = QtWidgets.QPushButton("Close")
-
-    def create_layout(self):
-        output_path_layout = QtWidgets.QHBoxLayout()
-        output_path_layout.setSpacing(4)
-        output_path_layout.addWidget(self.output_dir_path_le)
-        output_path_layout.addWidget(self.output_dir_path_select_btn)
-        output_path_layout.addWidget(self.output_dir_path_show_folder_btn)
-
-        output_file_layout = QtWidgets.QHBoxLayout()
-        output_file_layout.setSpacing(4)
-        output_file_layout.addWidget(self.output_filename_le)
-        output_file_layout.addWidget(self.force_overwrite_cb)
-
-        output_layout = QtWidgets.QFormLayout()
-        output_layout.setSpacing(4)
-        output_layout.addRow("Directory:", output_path_layout)
-        output_layout.addRow("Filename:", output_file_layout)
-
-        output_grp = QtWidgets.QGroupBox("Output")
-        output_grp.setLayout(output_layout)
-
-        camera_options_layout = QtWidgets.QHBoxLayout()
-        camera_options_layout.setSpacing(4)
-        camera_options_layout.addWidget(self.camera_select_cmb)
-        camera_options_layout.addWidget(self.camera_select_hide_defaults_cb)
-
-        resolution_layout = QtWidgets.QHBoxLayout()
-        resolution_layout.setSpacing(4)
-        resolution_layout.addWidget(self.resolution_select_cmb)
-        resolution_layout.addWidget(self.resolution_width_sb)
-        resolution_layout.addWidget(QtWidgets.QLabel("x"))
-        resolution_layout.addWidget(self.resolution_height_sb)
-
-        frame_range_layout = QtWidgets.QHBoxLayout()
-        frame_range_layout.setSpacing(4)
-        frame_range_layout.addWidget(self.frame_range_cmb)
-        frame_range_layout.addWidget(self.frame_range_start_sb)
-        frame_range_layout.addWidget(self.frame_range_end_sb)
-
-        encoding_layout = QtWidgets.QHBoxLayout()
-        encoding_layout.setSpacing(4)
-        encoding_layout.addWidget(self.encoding_container_cmb)
-        encoding_layout.addWidget(self.encoding_video_codec_cmb)
-        encoding_layout.addWidget(self.encoding_video_codec_settings_btn)
-
-        visibility_layout = QtWidgets.QHBoxLayout()
-        visibility_layout.setSpacing(4)
-        visibility_layout.addWidget(self.visibility_cmb)
-        visibility_layout.addWidget(self.visibility_customize_btn)
-
-        options_layout = QtWidgets.QFormLayout()
-        options_layout.addRow("Camera:", camera_options_layout)
-        options_layout.addRow("Resolution:", resolution_layout)
-        options_layout.addRow("Frame Range:", frame_range_layout)
-        options_layout.addRow("Encoding:", encoding_layout)
-        options_layout.addRow("Visiblity:", visibility_layout)
-        options_layout.addRow("Ornaments:", self.ornaments_cb)
-        options_layout.addRow("Show in Viewer:", self.viewer_cb)
-
-        options_grp = QtWidgets.QGroupBox("Options")
-        options_grp.setLayout(options_layout)
-
-        button_layout = QtWidgets.QHBoxLayout()
-        button_layout.addWidget(self.refresh_btn)
-        button_layout.addWidget(self.clear_btn)
-        button_layout.addStretch()
-        button_layout.addWidget(self.playblast_btn)
-        button_layout.addWidget(self.close_btn)
-
-        status_bar_layout = QtWidgets.QHBoxLayout()
-        status_bar_layout.addStretch()
-        status_bar_layout.addWidget(QtWidgets.QLabel("v{0}".format(BPlayblast.VERSION)))
-
-
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setContentsMargins(4, 4, 4, 4)
-        main_layout.setSpacing(4)
-        main_layout.setMenuBar(self.main_menu)
-        main_layout.addWidget(output_grp)
-        main_layout.addWidget(options_grp)
-        main_layout.addWidget(self.output_edit)
-        main_layout.addLayout(button_layout)
-        main_layout.addLayout(status_bar_layout)
-
-    def create_connections(self):
-        self.output_dir_path_select_btn.clicked.connect(self.select_output_directory)
-        self.output_dir_path_show_folder_btn.clicked.connect(self.open_output_directory)
-
-        self.camera_select_cmb.currentTextChanged.connect(self.on_camera_changed)
-        self.camera_select_hide_defaults_cb.toggled.connect(self.refresh_cameras)
-
-        self.frame_range_cmb.currentTextChanged.connect(self.refresh_frame_range)
-        self.frame_range_start_sb.valueChanged.connect(self.on_frame_range_changed)
-        self.frame_range_end_sb.valueChanged.connect(self.on_frame_range_changed)
-
-        self.encoding_container_cmb.currentTextChanged.connect(self.refresh_video_encoders)
-        self.encoding_video_codec_cmb.currentTextChanged.connect(self.on_video_encoder_changed)
-        self.encoding_video_codec_settings_btn.clicked.connect(self.show_encoder_settings_dialog)
-
-        self.resolution_select_cmb.currentTextChanged.connect(self.refresh_resolution)
-        self.resolution_width_sb.valueChanged.connect(self.on_resolution_changed)
-        self.resolution_height_sb.valueChanged.connect(self.on_resolution_changed)
-
-        self.visibility_cmb.currentTextChanged.connect(self.on_visibility_preset_changed)
-        self.visibility_customize_btn.clicked.connect(self.show_visibility_dialog)
-
-        self.refresh_btn.clicked.connect(self.refresh)
-        self.clear_btn.clicked.connect(self.output_edit.clear)
-        self.playblast_btn.clicked.connect(self.do_playblast)
-        self.close_btn.clicked.connect(self.close)
-
-        self._playblast.output_logged.connect(self.append_output)
-
-    def do_playblast(self):
-        output_dir_path = self.output_dir_path_le.text()
-        if not output_dir_path:
-            output_dir_path = self.output_dir_path_le.placeholderText()
-
-        filename = self.output_filename_le.text()
-        if not filename:
-            filename = self.output_filename_le.placeholderText()
-
-        padding = BPlayblast.DEFAULT_PADDING
-
-        show_ornaments = self.ornaments_cb.isChecked()
-        show_in_viewer = self.viewer_cb.isChecked()
-        overwrite = self.force_overwrite_cb.isChecked()
-
-        self._playblast.execute(output_dir_path, filename, padding, show_ornaments, show_in_viewer, overwrite)
-
-    def select_output_directory(self):
-        print("TODO: select_output_directory()")
+        playblast_failed = False
+        try:
+            try:
+                self.set_active_camera(camera)
+                self.set_viewport_visibility(model_editor, changed_visibility_flags)
+
+                cmds.playblast(**options)
+            except:
+                traceback.print_exc()
+                self.log_error("Failed to created playblast. See script editor for details")
+                playblast_failed = True
+            finally:
+                # Restore original viewport settings
+                self.set_active_camera(orig_camera)
+                self.set_viewport_visibility(model_editor, restore_visibility_flags)
+        except:
+            # The pipe would otherwise wait forever for frames that are never written
+            if ffmpeg_pipe:
+                self.finish_ffmpeg_pipe(ffmpeg_pipe, True)
+                self.remove_temp_dir(playblast_output_dir)
+                self.finalize_output(temp_output_path, output_path, False)
+            raise
 
-    def open_output_directory(self):
-        print("TODO: open_output_directory()")
+        if self.requires_ffmpeg():
+            encode_succeeded = self.finish_ffmpeg_pipe(ffmpeg_pipe, playblast_failed)
 
-    def refresh(self):
-        print("TODO: refresh()")
+            # The frames are still on disk, encode them again on the CPU if the hardware encoder failed
+            if not encode_succeeded and not playblast_failed and self.get_hw_encoder():
+                self.log_warning(f"Hardware encoding with {self._hw_encoder} failed. Falling back to libx264")
+                self._hw_encoder = None
 
-    def refresh_cameras(self):
-        print("TODO: refresh_cameras()")
+                ffmpeg_args = self.create_h264_args(temp_output_path, start_frame)
+                ffmpeg_pipe = self.start_ffmpeg_pipe(ffmpeg_args, playblast_output, padding)
+                encode_succeeded = self.finish_ffmpeg_pipe(ffmpeg_pipe, False)
 
-    def on_camera_changed(self):
-        print("TODO: on_camera_changed()")
+            self.remove_temp_dir(playblast_output_dir)
 
-    def refresh_resolution(self):
-        print("TODO: refresh_resolution()")
+            if not encode_succeeded and not playblast_failed:
+                self.log_error("Encoding failed. See output log for details")
 
-    def on_resolution_changed(self):
-        print("TODO: on_resolution_changed()")
+            if not self.finalize_output(temp_output_path, output_path, encode_succeeded):
+                return
 
-    def refresh_frame_range(self):
-        print("TODO: refresh_frame_range()")
+        if playblast_failed:
+            return
 
-    def on_frame_range_changed(self):
-        print("TODO: on_frame_range_changed()")
+        if self.requires_ffmpeg() and show_in_viewer:
+            self.open_in_viewer(output_path)
 
-    def refresh_video_encoders(self):
-        print("TODO: refresh_video_encoders()")
+class BPlayblastFramePipe(QtCore.QThread):
 
-    def on_video_encoder_changed(self):
-        print("TODO: on_video_encoder_changed()")
+    POLL_INTERVAL_MS = 5
 
-    def show_encoder_settings_dialog(self):
-        print("TODO: show_encoder_settings_dialog()")
+    output_logged = QtCore.Signal(str)
 
-    def on_encoder_settings_dialog_modified(self):
-        print("TODO: on_encoder_settings_dialog_modified()")
+    def __init__(self, ffmpeg_path, ffmpeg_args, frame_path_prefix, padding):
+        super(BPlayblastFramePipe, self).__init__()
 
-    def on_visibility_preset_changed(self):
-        print("TODO: on_visibility_preset_changed()")
+        self._ffmpeg_path = ffmpeg_path
+        self._ffmpeg_args = ffmpeg_args
+        self._frame_path_prefix = frame_path_prefix
+        self._padding = padding
 
-    def show_visibility_dialog(self):
-        print("TODO: show_visibility_dialog()")
+        self._playblast_finished = False
+        self._playblast_failed = False
 
-    def on_visibility_dialog_modified(self):
-        print("TODO: on_visibility_dialog_modified()")
+        self._succeeded = False
 
-    def save_settings(self):
-        cmds.optionVar(sv=("BPlayblastUiFFmpegPath", self._playblast.get_ffmpeg_path()))
+    def is_successful(self):
+        return self._succeeded
 
-    def load_settings(self):
-        if cmds.optionVar(exists="BPlayblastUiFFmpegPath"):
-            self._playblast.set_ffmpeg_path(cmds.optionVar(q="BPlayblastUiFFmpegPath"))
+    def set_playblast_finished(self, failed):
+        self._playblast_failed = failed
+        self._playblast_finished = True
 
-    def save_defaults(self):
-        print("TODO: save_defaults()")
+    def get_frame_path(self, frame_index):
+        return f"{self._frame_path_prefix}.{frame_index:0{self._padding}d}.bmp"
 
-    def load_defaults(self):
-        print("TODO: load_defaults()")
+    def wait_for_frame(self, frame_index):
+        # Frames are written in order, so a frame is complete once the next one exists
+        next_frame_path = self.get_frame_path(frame_index + 1)
+        while not self._playblast_finished and not os.path.exists(next_frame_path):
+            self.msleep(BPlayblastFramePipe.POLL_INTERVAL_MS)
 
-    def show_settings_dialog(self):
-        if not self._settings_dialog:
-            self._settings_dialog = BPlayblastSettingsDialog(self)
-            self._settings_dialog.accepted.connect(self.on_settings_dialog_modified)
+        return not self._playblast_failed and os.path.exists(self.get_frame_path(frame_index))
 
-        self._settings_dialog.set_ffmpeg_path(self._playblast.get_ffmpeg_path())
+    def run(self):
+        # The process must be created in this thread, QProcess can only be used from the thread that owns it
+        ffmpeg_process = QtCore.QProcess()
+        ffmpeg_process.start(self._ffmpeg_path, self._ffmpeg_args)
+        if not ffmpeg_process.waitForStarted():
+            self.output_logged.emit("[ERROR] Failed to start ffmpeg")
+            return
 
-        self._settings_dialog.show()
+        frame_index = 0
+        while self.wait_for_frame(frame_index):
+            with open(self.get_frame_path(frame_index), "rb") as frame_file:
+                ffmpeg_process.write(frame_file.read())
 
-    def on_settings_dialog_modified(self):
-        ffmpeg_path = self._settings_dialog.get_ffmpeg_path()
-        self._playblast.set_ffmpeg_path(ffmpeg_path)
+            while ffmpeg_process.bytesToWrite() > 0:
+                if not ffmpeg_process.waitForBytesWritten(-1):
+                    break
 
-        self.save_settings()
+            self.process_ffmpeg_output(ffmpeg_process)
 
-    def show_about_dialog(self):
-        text = '<h2>{0}</h2>'.format(BPlayblastUi.TITLE)
-        text += '<p>Version: {0}</p>'.format(BPlayblast.VERSION)
-        text += '<p>Author: Jacob Provencher</p>'
-        text += '<p>Website: <a style="color:white;" href="https://jacprovjp.wixsite.com/portfolio">jacobprovencher.com</a></p><br>'
+            if ffmpeg_process.state() == QtCore.QProcess.NotRunning:
+                self.output_logged.emit(f"[ERROR] ffmpeg exited before all frames were written (exit code {ffmpeg_process.exitCode()})")
+                return
 
-        QtWidgets.QMessageBox().about(self, "About", "{0}".format(text))
+            frame_index += 1
 
-    def append_output(self, text):
-        self.output_edit.appendPlainText(text)
+        ffmpeg_process.closeWriteChannel()
+        if self._playblast_failed:
+            ffmpeg_process.kill()
 
-    def keyPressEvent(self, event):
-        super(BPlayblastUi, self).keyPressEvent(event)
-        event.accept()
+        ffmpeg_process.waitForFinished(-1)
+        self.process_ffmpeg_output(ffmpeg_process)
 
+        if self._playblast_failed:
+            return
 
-if __name__ == "__main__":
+        if ffmpeg_process.exitStatus() != QtCore.QProcess.NormalExit or ffmpeg_process.exitCode() != 0:
+            self.output_logged.emit(f"[ERROR] ffmpeg failed (exit code {ffmpeg_process.exitCode()})")
+            return
 
-    try:
-        jacob_playblast_dialog.close() # pylint: disable=E0601
-        jacob_playblast_dialog.deleteLater()
-    except:
-        pass
+        self._succeeded = True
 
-    jacob_playblast_dialog = BPlayblastUi()
-    jacob_playblast_dialog.show()
+    def process_ffmpeg_output(self, ffmpeg_process):
+        byte_array_output = ffmpeg_process.readAllStandardError()
+        if not byte_array_output:
+            return
 
+        if sys.version_info.major < 3:
+            output = str(byte_array_output)
+        else:
+            output = str(byte_array_output, "utf-8")
 
+        self.output_logged.emit(output)
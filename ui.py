@@ -0,0 +1,441 @@
+import sys
+
+from PySide2 import QtCore, QtGui, QtWidgets
+
+from shiboken2 import wrapInstance
+
+import maya.cmds as cmds
+import maya.OpenMayaUI as omui
+
+from main import BPlayblast
+
+
+class BPlayblastUi(QtWidgets.QDialog):
+
+    TITLE = "BPlayblast"
+
+    MAX_OUTPUT_LINES = 10000
+
+    SPIN_BOX_DEBOUNCE_MS = 50
+
+    ABOUT_TEXT = ('<h2>{0}</h2>'
+                  '<p>Version: {1}</p>'
+                  '<p>Author: Jacob Provencher</p>'
+                  '<p>Website: <a style="color:white;" href="https://jacprovjp.wixsite.com/portfolio">jacobprovencher.com</a></p><br>').format(TITLE, BPlayblast.VERSION)
+
+
+    def __init__(self):
+        if sys.version_info.major < 3:
+            maya_main_window = wrapInstance(long(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
+        else:
+            maya_main_window = wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
+
+        super(BPlayblastUi, self).__init__(maya_main_window)
+
+        self.setWindowTitle(BPlayblastUi.TITLE)
+        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
+        self.setMinimumWidth(500)
+
+        self._playblast = BPlayblast()
+
+        self.load_settings()
+
+        self._settings_dialog = None
+
+        self._pending_output_lines = []
+
+        self._initial_state_populated = False
+
+        self.create_actions()
+        self.create_menus()
+        self.create_widgets()
+        self.create_layout()
+        self.create_timers()
+        self.create_connections()
+
+        self.append_output(f"BPlayblast v{BPlayblast.VERSION}")
+
+    def create_actions(self):
+        self.save_defaults_action = QtWidgets.QAction("Save Defaults", self)
+        self.save_defaults_action.triggered.connect(self.save_defaults)
+
+        self.load_defaults_action = QtWidgets.QAction("Load Defaults", self)
+        self.load_defaults_action.triggered.connect(self.load_defaults)
+
+        self.show_settings_action = QtWidgets.QAction("Settings...", self)
+        self.show_settings_action.triggered.connect(self.show_settings_dialog)
+
+        self.show_about_action = QtWidgets.QAction("About", self)
+        self.show_about_action.triggered.connect(self.show_about_dialog)
+
+    def create_menus(self):
+        self.main_menu = QtWidgets.QMenuBar()
+
+        edit_menu = self.main_menu.addMenu("Edit")
+        edit_menu.addAction(self.save_defaults_action)
+        edit_menu.addAction(self.load_defaults_action)
+        edit_menu.addSeparator()
+        edit_menu.addAction(self.show_settings_action)
+
+        help_menu = self.main_menu.addMenu("Help")
+        help_menu.addAction(self.show_about_action)
+
+    def create_widgets(self):
+        self.output_dir_path_le = QtWidgets.QLineEdit()
+        self.output_dir_path_le.setPlaceholderText("{project}/movies")
+
+        self.output_dir_path_select_btn = QtWidgets.QPushButton("...")
+        self.output_dir_path_select_btn.setFixedSize(24, 19)
+        self.output_dir_path_select_btn.setToolTip("Select Output Directory")
+
+        self.output_dir_path_show_folder_btn = QtWidgets.QPushButton(QtGui.QIcon(":fileOpen.png"), "")
+        self.output_dir_path_show_folder_btn.setFixedSize(24, 19)
+        self.output_dir_path_show_folder_btn.setToolTip("Show in Folder")
+
+        self.output_filename_le = QtWidgets.QLineEdit()
+        self.output_filename_le.setPlaceholderText("{scene}")
+        self.output_filename_le.setMaximumWidth(200)
+        self.force_overwrite_cb = QtWidgets.QCheckBox("Force overwrite")
+
+        self.resolution_select_cmb = QtWidgets.QComboBox()
+
+        self.resolution_width_sb = QtWidgets.QSpinBox()
+        self.resolution_width_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
+        self.resolution_width_sb.setRange(1, 9999)
+        self.resolution_width_sb.setMinimumWidth(40)
+        self.resolution_width_sb.setAlignment(QtCore.Qt.AlignRight)
+        self.resolution_height_sb = QtWidgets.QSpinBox()
+        self.resolution_height_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
+        self.resolution_height_sb.setRange(1, 9999)
+        self.resolution_height_sb.setMinimumWidth(40)
+        self.resolution_height_sb.setAlignment(QtCore.Qt.AlignRight)
+
+        self.camera_select_cmb = QtWidgets.QComboBox()
+        self.camera_select_hide_defaults_cb = QtWidgets.QCheckBox("Hide defaults")
+
+        self.frame_range_cmb = QtWidgets.QComboBox()
+
+        self.frame_range_start_sb = QtWidgets.QSpinBox()
+        self.frame_range_start_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
+        self.frame_range_start_sb.setRange(-9999, 9999)
+        self.frame_range_start_sb.setMinimumWidth(40)
+        self.frame_range_start_sb.setAlignment(QtCore.Qt.AlignRight)
+
+        self.frame_range_end_sb = QtWidgets.QSpinBox()
+        self.frame_range_end_sb.setButtonSymbols(QtWidgets.QSpinBox.NoButtons)
+        self.frame_range_end_sb.setRange(-9999, 9999)
+        self.frame_range_end_sb.setMinimumWidth(40)
+        self.frame_range_end_sb.setAlignment(QtCore.Qt.AlignRight)
+
+        self.encoding_container_cmb = QtWidgets.QComboBox()
+
+        self.encoding_video_codec_cmb = QtWidgets.QComboBox()
+        self.encoding_video_codec_settings_btn = QtWidgets.QPushButton("Settings...")
+        self.encoding_video_codec_settings_btn.setFixedHeight(19)
+
+        self.visibility_cmb = QtWidgets.QComboBox()
+
+        self.visibility_customize_btn = QtWidgets.QPushButton("Customize...")
+        self.visibility_customize_btn.setFixedHeight(19)
+
+        self.ornaments_cb = QtWidgets.QCheckBox()
+        self.ornaments_cb.setChecked(True)
+
+        self.viewer_cb = QtWidgets.QCheckBox()
+        self.viewer_cb.setChecked(True)
+
+        self.output_edit = QtWidgets.QPlainTextEdit()
+        self.output_edit.setReadOnly(True)
+        self.output_edit.setWordWrapMode(QtGui.QTextOption.NoWrap)
+        self.output_edit.document().setMaximumBlockCount(BPlayblastUi.MAX_OUTPUT_LINES)
+
+        self._output_cursor = self.output_edit.textCursor()
+        self._output_cursor.movePosition(QtGui.QTextCursor.End)
+
+        self.refresh_btn = QtWidgets.QPushButton("Refresh")
+        self.clear_btn = QtWidgets.QPushButton("Clear")
+        self.playblast_btn = QtWidgets.QPushButton("Playblast")
+        self.close_btn = QtWidgets.QPushButton("Close")
+
+    def create_hbox_layout(self, widgets):
+        layout = QtWidgets.QHBoxLayout()
+        layout.setSpacing(4)
+        for widget in widgets:
+            layout.addWidget(widget)
+
+        return layout
+
+    def create_layout(self):
+        output_rows = (
+            ("Directory:", (self.output_dir_path_le, self.output_dir_path_select_btn, self.output_dir_path_show_folder_btn)),
+            ("Filename:", (self.output_filename_le, self.force_overwrite_cb)),
+        )
+
+        output_layout = QtWidgets.QFormLayout()
+        output_layout.setSpacing(4)
+        for label, widgets in output_rows:
+            output_layout.addRow(label, self.create_hbox_layout(widgets))
+
+        output_grp = QtWidgets.QGroupBox("Output")
+        output_grp.setLayout(output_layout)
+
+        option_rows = (
+            ("Camera:", (self.camera_select_cmb, self.camera_select_hide_defaults_cb)),
+            ("Resolution:", (self.resolution_select_cmb, self.resolution_width_sb, QtWidgets.QLabel("x"), self.resolution_height_sb)),
+            ("Frame Range:", (self.frame_range_cmb, self.frame_range_start_sb, self.frame_range_end_sb)),
+            ("Encoding:", (self.encoding_container_cmb, self.encoding_video_codec_cmb, self.encoding_video_codec_settings_btn)),
+            ("Visiblity:", (self.visibility_cmb, self.visibility_customize_btn)),
+        )
+
+        options_layout = QtWidgets.QFormLayout()
+        for label, widgets in option_rows:
+            options_layout.addRow(label, self.create_hbox_layout(widgets))
+        options_layout.addRow("Ornaments:", self.ornaments_cb)
+        options_layout.addRow("Show in Viewer:", self.viewer_cb)
+
+        options_grp = QtWidgets.QGroupBox("Options")
+        options_grp.setLayout(options_layout)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        button_layout.addWidget(self.refresh_btn)
+        button_layout.addWidget(self.clear_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(self.playblast_btn)
+        button_layout.addWidget(self.close_btn)
+
+        status_bar_layout = QtWidgets.QHBoxLayout()
+        status_bar_layout.addStretch()
+        status_bar_layout.addWidget(QtWidgets.QLabel("v{0}".format(BPlayblast.VERSION)))
+
+
+        main_layout = QtWidgets.QVBoxLayout(self)
+        main_layout.setContentsMargins(4, 4, 4, 4)
+        main_layout.setSpacing(4)
+        main_layout.setMenuBar(self.main_menu)
+        main_layout.addWidget(output_grp)
+        main_layout.addWidget(options_grp)
+        main_layout.addWidget(self.output_edit)
+        main_layout.addLayout(button_layout)
+        main_layout.addLayout(status_bar_layout)
+
+    def create_timers(self):
+        # Spin box edits are coalesced so dragging or typing only applies the last value
+        self.resolution_changed_timer = QtCore.QTimer(self)
+        self.resolution_changed_timer.setSingleShot(True)
+        self.resolution_changed_timer.setInterval(BPlayblastUi.SPIN_BOX_DEBOUNCE_MS)
+
+        self.frame_range_changed_timer = QtCore.QTimer(self)
+        self.frame_range_changed_timer.setSingleShot(True)
+        self.frame_range_changed_timer.setInterval(BPlayblastUi.SPIN_BOX_DEBOUNCE_MS)
+
+    def create_connections(self):
+        self.output_dir_path_select_btn.clicked.connect(self.select_output_directory)
+        self.output_dir_path_show_folder_btn.clicked.connect(self.open_output_directory)
+
+        self.camera_select_hide_defaults_cb.toggled.connect(self.refresh_cameras)
+
+        self.encoding_video_codec_settings_btn.clicked.connect(self.show_encoder_settings_dialog)
+
+        self.visibility_customize_btn.clicked.connect(self.show_visibility_dialog)
+
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.clear_btn.clicked.connect(self.output_edit.clear)
+        self.playblast_btn.clicked.connect(self.do_playblast)
+        self.close_btn.clicked.connect(self.close)
+
+        self._playblast.output_logged.connect(self.append_output)
+
+    def create_dynamic_connections(self):
+        self.camera_select_cmb.currentTextChanged.connect(self.on_camera_changed)
+
+        self.frame_range_cmb.currentTextChanged.connect(self.refresh_frame_range)
+        self.frame_range_start_sb.valueChanged.connect(lambda: self.frame_range_changed_timer.start())
+        self.frame_range_end_sb.valueChanged.connect(lambda: self.frame_range_changed_timer.start())
+        self.frame_range_changed_timer.timeout.connect(self.on_frame_range_changed)
+
+        self.encoding_container_cmb.currentTextChanged.connect(self.refresh_video_encoders)
+        self.encoding_video_codec_cmb.currentTextChanged.connect(self.on_video_encoder_changed)
+
+        self.resolution_select_cmb.currentTextChanged.connect(self.refresh_resolution)
+        self.resolution_width_sb.valueChanged.connect(lambda: self.resolution_changed_timer.start())
+        self.resolution_height_sb.valueChanged.connect(lambda: self.resolution_changed_timer.start())
+        self.resolution_changed_timer.timeout.connect(self.on_resolution_changed)
+
+        self.visibility_cmb.currentTextChanged.connect(self.on_visibility_preset_changed)
+
+    def populate_initial_state(self):
+        # The dynamic connections are only created once the widgets are populated, so no slot fires while filling them
+        self.resolution_select_cmb.addItems(list(BPlayblast.RESOLUTION_LOOKUP.keys()))
+        self.resolution_select_cmb.setCurrentText(BPlayblast.DEFAULT_RESOLUTION)
+
+        self.frame_range_cmb.addItems(BPlayblast.FRAME_RANGE_PRESETS)
+        self.frame_range_cmb.setCurrentText(BPlayblast.DEFAULT_FRAME_RANGE)
+
+        self.encoding_container_cmb.addItems(list(BPlayblast.VIDEO_ENCODER_LOOKUP.keys()))
+        self.encoding_container_cmb.setCurrentText(BPlayblast.DEFAULT_CONTAINER)
+
+        self.encoding_video_codec_cmb.addItems(BPlayblast.VIDEO_ENCODER_LOOKUP[BPlayblast.DEFAULT_CONTAINER])
+        self.encoding_video_codec_cmb.setCurrentText(BPlayblast.DEFAULT_ENCODER)
+
+        self.visibility_cmb.addItems(list(BPlayblast.VIEWPORT_VISIBILITY_PRESETS.keys()))
+        self.visibility_cmb.setCurrentText(BPlayblast.DEFAULT_VISIBILITY)
+
+        self.create_dynamic_connections()
+
+        self._initial_state_populated = True
+
+    def do_playblast(self):
+        output_dir_path = self.output_dir_path_le.text()
+        if not output_dir_path:
+            output_dir_path = self.output_dir_path_le.placeholderText()
+
+        filename = self.output_filename_le.text()
+        if not filename:
+            filename = self.output_filename_le.placeholderText()
+
+        padding = BPlayblast.DEFAULT_PADDING
+
+        show_ornaments = self.ornaments_cb.isChecked()
+        show_in_viewer = self.viewer_cb.isChecked()
+        overwrite = self.force_overwrite_cb.isChecked()
+
+        self._playblast.execute(output_dir_path, filename, padding, show_ornaments, show_in_viewer, overwrite)
+
+    def select_output_directory(self):
+        print("TODO: select_output_directory()")
+
+    def open_output_directory(self):
+        print("TODO: open_output_directory()")
+
+    def refresh(self):
+        print("TODO: refresh()")
+
+    def refresh_cameras(self):
+        print("TODO: refresh_cameras()")
+
+    def on_camera_changed(self):
+        print("TODO: on_camera_changed()")
+
+    def refresh_resolution(self):
+        print("TODO: refresh_resolution()")
+
+    def on_resolution_changed(self):
+        print("TODO: on_resolution_changed()")
+
+    def refresh_frame_range(self):
+        print("TODO: refresh_frame_range()")
+
+    def on_frame_range_changed(self):
+        print("TODO: on_frame_range_changed()")
+
+    def refresh_video_encoders(self):
+        print("TODO: refresh_video_encoders()")
+
+    def on_video_encoder_changed(self):
+        print("TODO: on_video_encoder_changed()")
+
+    def show_encoder_settings_dialog(self):
+        print("TODO: show_encoder_settings_dialog()")
+
+    def on_encoder_settings_dialog_modified(self):
+        print("TODO: on_encoder_settings_dialog_modified()")
+
+    def on_visibility_preset_changed(self):
+        print("TODO: on_visibility_preset_changed()")
+
+    def show_visibility_dialog(self):
+        print("TODO: show_visibility_dialog()")
+
+    def on_visibility_dialog_modified(self):
+        print("TODO: on_visibility_dialog_modified()")
+
+    def save_settings(self):
+        cmds.optionVar(sv=("BPlayblastUiFFmpegPath", self._playblast.get_ffmpeg_path()))
+
+    def load_settings(self):
+        if cmds.optionVar(exists="BPlayblastUiFFmpegPath"):
+            self._playblast.set_ffmpeg_path(cmds.optionVar(q="BPlayblastUiFFmpegPath"))
+
+    def save_defaults(self):
+        print("TODO: save_defaults()")
+
+    def load_defaults(self):
+        print("TODO: load_defaults()")
+
+    def show_settings_dialog(self):
+        if not self._settings_dialog:
+            # Imported on first use, most sessions never open the settings
+            from settings_dialog import BPlayblastSettingsDialog
+
+            self._settings_dialog = BPlayblastSettingsDialog(self)
+            self._settings_dialog.accepted.connect(self.on_settings_dialog_modified)
+
+        self._settings_dialog.set_ffmpeg_path(self._playblast.get_ffmpeg_path())
+
+        self._settings_dialog.show()
+
+    def on_settings_dialog_modified(self):
+        ffmpeg_path = self._settings_dialog.get_ffmpeg_path()
+        self._playblast.set_ffmpeg_path(ffmpeg_path)
+
+        self.save_settings()
+
+    def show_about_dialog(self):
+        QtWidgets.QMessageBox.about(self, "About", BPlayblastUi.ABOUT_TEXT)
+
+    def append_output(self, text):
+        # Lines are queued and flushed together, so a burst of output only updates the document once
+        if not self._pending_output_lines:
+            QtCore.QTimer.singleShot(0, self.flush_output)
+
+        self._pending_output_lines.append(text)
+
+    def flush_output(self):
+        if not self._pending_output_lines:
+            return
+
+        text = "\n".join(self._pending_output_lines)
+        self._pending_output_lines = []
+
+        if not self.output_edit.document().isEmpty():
+            text = "\n" + text
+
+        self.output_edit.setUpdatesEnabled(False)
+        self._output_cursor.movePosition(QtGui.QTextCursor.End)
+        self._output_cursor.insertText(text)
+        self.output_edit.setUpdatesEnabled(True)
+
+        scroll_bar = self.output_edit.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    def showEvent(self, event):
+        super(BPlayblastUi, self).showEvent(event)
+
+        if not self._initial_state_populated:
+            self.populate_initial_state()
+
+        # Cache the scene and project paths while the window is open, closeEvent removes the callbacks
+        self._playblast.create_callbacks()
+
+    def closeEvent(self, event):
+        self._playblast.close()
+
+        super(BPlayblastUi, self).closeEvent(event)
+
+    def keyPressEvent(self, event):
+        super(BPlayblastUi, self).keyPressEvent(event)
+        event.accept()
+
+
+if __name__ == "__main__":
+
+    try:
+        jacob_playblast_dialog.close() # pylint: disable=E0601
+        jacob_playblast_dialog.deleteLater()
+    except:
+        pass
+
+    jacob_playblast_dialog = BPlayblastUi()
+    jacob_playblast_dialog.show()
+
+